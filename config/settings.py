@@ -1,7 +1,35 @@
+import functools
 import os
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
 
-load_dotenv()
+# Exported once the .env values have been merged, so child processes
+# (e.g. pytest-xdist workers) inheriting the environment skip re-parsing.
+_DOTENV_LOADED_VAR = 'KOTLIN_DSL_DOTENV_LOADED'
+_LOADED = False
+
+
+@functools.lru_cache(maxsize=1)
+def _load():
+    """Parse the .env file once and cache the resulting values."""
+    return dotenv_values(find_dotenv())
+
+
+def _load_env():
+    """Merge .env values into os.environ, without overriding existing ones."""
+    global _LOADED
+    if _LOADED or os.environ.get(_DOTENV_LOADED_VAR):
+        _LOADED = True
+        return
+
+    for key, value in _load().items():
+        if value is not None:
+            os.environ.setdefault(key, value)
+
+    os.environ[_DOTENV_LOADED_VAR] = '1'
+    _LOADED = True
+
+
+_load_env()
 
 
 class Settings:
@@ -21,11 +49,18 @@ class Settings:
     POLL_INTERVAL = 2
     MAX_RETRIES = 3
 
-    @property
+    @functools.cached_property
     def auth(self):
         if self.TEAMCITY_TOKEN:
             return {'Authorization': f'Bearer {self.TEAMCITY_TOKEN}'}
         return (self.TEAMCITY_USERNAME, self.TEAMCITY_PASSWORD)
 
+    def invalidate_auth(self):
+        """Drop the cached auth so it is rebuilt on next access (e.g. after token rotation)."""
+        self.__dict__.pop('auth', None)
+
 
-settings = Settings()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance."""
+    return Settings()
@@ -4,25 +4,35 @@ Cleanup script for test environment.
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.teamcity_client import TeamCityClient
 
+# Concurrent deletions; kept low to stay under TeamCity's request throttling.
+MAX_DELETE_WORKERS = 3
+
+TEST_PROJECT_PREFIX = 'Test'
+
 
 def cleanup_test_projects():
     """Remove all test projects created during testing."""
     try:
         client = TeamCityClient()
-        projects = client.get_projects()
-
-        test_projects = [p for p in projects if p['id'].startswith('Test')]
-
-        print(f"Found {len(test_projects)} test projects to cleanup")
-
-        for project in test_projects:
-            try:
-                client.delete_project(project['id'])
-                print(f"✅ Deleted project: {project['id']}")
-            except Exception as e:
-                print(f"❌ Failed to delete project {project['id']}: {e}")
+        test_project_ids = list(client.iter_project_ids(prefix=TEST_PROJECT_PREFIX))
+
+        print(f"Found {len(test_project_ids)} test projects to cleanup")
+
+        with ThreadPoolExecutor(max_workers=MAX_DELETE_WORKERS) as executor:
+            futures = {executor.submit(client.delete_project, pid): pid for pid in test_project_ids}
+
+            for future in as_completed(futures):
+                project_id = futures[future]
+                try:
+                    if future.result():
+                        print(f"✅ Deleted project: {project_id}")
+                    else:
+                        print(f"❌ Failed to delete project {project_id}")
+                except Exception as e:
+                    print(f"❌ Failed to delete project {project_id}: {e}")
 
         print("Cleanup completed")
         return True
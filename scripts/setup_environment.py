@@ -3,32 +3,52 @@
 Setup script for TeamCity test environment.
 """
 
+import logging
 import os
 import sys
 import time
 import requests
-from config.settings import settings
+import urllib3
+from requests.adapters import HTTPAdapter
+from config.settings import get_settings
 from utils.teamcity_client import TeamCityClient
 
+logger = logging.getLogger(__name__)
 
-def wait_for_teamcity():
-    """Wait for TeamCity server to be ready."""
-    print("Waiting for TeamCity server to start...")
+_REQUIRED_VARS = ('TEAMCITY_URL', 'TEAMCITY_USERNAME', 'TEAMCITY_PASSWORD')
 
-    for attempt in range(60):  # Wait up to 10 minutes
+# Readiness probes use verify=False; silence the per-request warning once here.
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Shared keep-alive session for unauthenticated probes against the server.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+
+def wait_for_teamcity(timeout: float = 600, base_delay: float = 0.5, max_delay: float = 10) -> bool:
+    """Wait for TeamCity server to be ready, backing off exponentially between probes."""
+    logger.info("Waiting for TeamCity server to start...")
+
+    url = f"{get_settings().TEAMCITY_URL}/app/rest/server"
+
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while time.monotonic() < deadline:
         try:
-            response = requests.get(f"{settings.TEAMCITY_URL}/app/rest/server",
-                                    timeout=5, verify=False)
+            response = _SESSION.head(url, timeout=5, verify=False)
             if response.status_code == 200:
-                print("TeamCity server is ready!")
+                logger.info("TeamCity server is ready!")
                 return True
         except requests.exceptions.RequestException:
             pass
 
-        print(f"Attempt {attempt + 1}/60 - TeamCity not ready yet...")
-        time.sleep(10)
+        logger.debug(f"Attempt {attempt + 1} - TeamCity not ready yet...")
+        time.sleep(min(max_delay, base_delay * 2 ** attempt))
+        attempt += 1
 
-    print("TeamCity server failed to start within timeout")
+    logger.info("TeamCity server failed to start within timeout")
     return False
 
 
@@ -59,10 +79,9 @@ def verify_setup():
         return False
 
     # Check environment variables
-    required_vars = ['TEAMCITY_URL', 'TEAMCITY_USERNAME', 'TEAMCITY_PASSWORD']
-    missing_vars = [var for var in required_vars if not getattr(settings, var)]
-
-    if missing_vars:
+    settings = get_settings()
+    if not all(getattr(settings, var) for var in _REQUIRED_VARS):
+        missing_vars = [var for var in _REQUIRED_VARS if not getattr(settings, var)]
         print(f"Missing required environment variables: {missing_vars}")
         return False
 
@@ -71,6 +90,7 @@ def verify_setup():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     if verify_setup():
         print("✅ Environment is ready for testing")
         sys.exit(0)
@@ -1,14 +1,25 @@
 import pytest
 import logging
+import random
+from typing import Any, Callable, Dict
 from utils.teamcity_client import TeamCityClient
 from utils.git_operations import GitOperations
 from utils.test_helpers import TestHelpers
-from config.settings import settings
+from config.settings import get_settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seeded once from OS entropy per worker; ids stay unique across sessions
+# without reading /dev/urandom for every test.
+_RNG = random.Random()
+
+
+def _generate_project_id(prefix: str) -> str:
+    """Generate a project ID with a random 32-bit hex suffix."""
+    return f"{prefix}_{_RNG.getrandbits(32):08x}"
+
 
 @pytest.fixture(scope="session")
 def teamcity_client():
@@ -18,17 +29,70 @@ def teamcity_client():
 
 
 @pytest.fixture(scope="session")
-def git_operations():
-    """Git operations fixture."""
-    with GitOperations() as git_ops:
+def base_git_clone():
+    """Bare clone of GIT_REPO_URL, made once per session for per-test worktrees."""
+    if not get_settings().GIT_REPO_URL:
+        pytest.skip("GIT_REPO_URL not configured")
+
+    with GitOperations() as base:
+        yield base.clone_repo(bare=True)
+
+
+@pytest.fixture
+def git_operations(base_git_clone):
+    """Git operations fixture; each test works in its own worktree of the session clone."""
+    with GitOperations(base_repo=base_git_clone) as git_ops:
         yield git_ops
 
 
 @pytest.fixture
 def test_project_id():
     """Generate unique test project ID."""
-    import uuid
-    return f"TestProj_{uuid.uuid4().hex[:8]}"
+    return _generate_project_id("TestProj")
+
+
+@pytest.fixture(scope="session")
+def scaffold_project(teamcity_client) -> Callable[[str], Dict[str, Any]]:
+    """
+    Factory for projects with a VCS root and versioned settings enabled.
+
+    Each key is provisioned once per session (per xdist worker) and reused, so
+    tests sharing a key only need to push their DSL variant.
+    """
+    scaffolds = {}
+    # Every project created, even one whose setup failed half way, so teardown can delete it
+    created = []
+
+    def get_scaffold(key: str) -> Dict[str, Any]:
+        if key not in scaffolds:
+            project_id = _generate_project_id(f"TestScaffold_{key}")
+
+            project_data = TestHelpers.generate_test_project_data(project_id)
+            teamcity_client.create_project(project_data)
+            created.append(project_id)
+
+            vcs_data = TestHelpers.generate_vcs_root_data(project_id, get_settings().GIT_REPO_URL)
+            vcs_root = teamcity_client.create_vcs_root(vcs_data)
+
+            vs_config = TestHelpers.generate_versioned_settings_config(vcs_root['id'])
+            versioned_settings = teamcity_client.enable_versioned_settings(project_id, vs_config)
+
+            scaffolds[key] = {
+                'project_id': project_id,
+                'vcs_root_id': vcs_root['id'],
+                'versioned_settings': versioned_settings
+            }
+        return scaffolds[key]
+
+    yield get_scaffold
+
+    # Cleanup
+    for project_id in created:
+        try:
+            teamcity_client.delete_project(project_id)
+            logger.info(f"Cleaned up scaffold project: {project_id}")
+        except Exception as e:
+            logger.warning(f"Failed to cleanup scaffold project {project_id}: {e}")
 
 
 @pytest.fixture
@@ -50,7 +114,7 @@ def cleanup_project(teamcity_client):
             logger.warning(f"Failed to cleanup project {project_id}: {e}")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_kotlin_dsl():
     """Sample Kotlin DSL content."""
     return '''
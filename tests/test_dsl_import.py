@@ -1,8 +1,9 @@
 import pytest
+import requests
 import time
 from utils.teamcity_client import TeamCityClient
 from utils.test_helpers import TestHelpers
-from config.settings import settings
+from config.settings import get_settings
 from utils.git_operations import GitOperations
 
 
@@ -29,7 +30,7 @@ class TestDSLImport:
         # Test import of project with VCS integration.
         cleanup_project(test_project_id)
 
-        if not settings.GIT_REPO_URL:
+        if not get_settings().GIT_REPO_URL:
             pytest.skip("GIT_REPO_URL not configured")
 
         # Create project
@@ -37,7 +38,7 @@ class TestDSLImport:
         teamcity_client.create_project(project_data)
 
         # Create VCS root
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
+        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, get_settings().GIT_REPO_URL)
         vcs_root = teamcity_client.create_vcs_root(vcs_data)
 
         # Enable versioned settings
@@ -62,13 +63,13 @@ class TestDSLImport:
             try:
                 project = teamcity_client.get_project(test_project_id)
                 return project.get('id') == test_project_id
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(project_ready, timeout=30)
 
         # Create VCS root
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
+        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, get_settings().GIT_REPO_URL)
         vcs_root = teamcity_client.create_vcs_root(vcs_data)
 
         # Enable versioned settings
@@ -82,11 +83,11 @@ class TestDSLImport:
         # Wait for build configurations to be created from DSL import
         def build_configs_ready():
             try:
-                build_configs = teamcity_client.get_build_configurations(test_project_id)
+                build_configs = teamcity_client.get_build_configurations(test_project_id,
+                                                                         fields='buildType(id,name)')
                 # Check if we have the expected build configuration
-                return (len(build_configs) > 0 and
-                        any(config.get('name') == 'Build' for config in build_configs))
-            except:
+                return any(config['name'] == 'Build' for config in build_configs)
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         # Wait up to 30 seconds for DSL import to complete
@@ -97,12 +98,15 @@ class TestDSLImport:
             error_message="Build configurations were not created from DSL import within timeout"
         )
         # Verify we can get build configurations
-        build_configs = teamcity_client.get_build_configurations(test_project_id)
+        build_configs = teamcity_client.get_build_configurations(test_project_id, fields='buildType(id,name)',
+                                                                 reuse_last=True)
         assert isinstance(build_configs, list)
         assert build_configs[0]['id'] == f"{test_project_id}_Build"
 
-    def test_project_validation_errors(self, teamcity_client: TeamCityClient, test_project_id: str):
+    def test_project_validation_errors(self, teamcity_client: TeamCityClient, test_project_id: str,
+                                       cleanup_project):
         # Test project validation with invalid data.
+        cleanup_project(test_project_id)
 
         # Test with invalid project data
         with pytest.raises(Exception):
@@ -115,6 +119,3 @@ class TestDSLImport:
 
         with pytest.raises(Exception):
             teamcity_client.create_project(project_data)  # Duplicate, should throw an exception
-
-        # Delete project
-        teamcity_client.delete_project(test_project_id)
@@ -0,0 +1,60 @@
+import os
+import pytest
+from utils.dsl_loader import DSLTemplateLoader
+
+
+_MULTI_BUILD_TEMPLATE = """project {{
+    id("{project_id}")
+// BUILD_DECLARATIONS
+}}
+// BUILD_TEMPLATE_START
+object {build_name} : BuildType({{
+    name = "{build_description}"
+}})
+// BUILD_TEMPLATE_END
+"""
+
+
+@pytest.mark.unit
+class TestDSLTemplateLoader:
+    # Test cases for loading and substituting DSL templates.
+
+    @pytest.fixture
+    def loader(self, tmp_path):
+        (tmp_path / "simple.kts").write_text('project {{ id("{project_id}") }}', encoding='utf-8')
+        (tmp_path / "multi.kts").write_text(_MULTI_BUILD_TEMPLATE, encoding='utf-8')
+        return DSLTemplateLoader(str(tmp_path))
+
+    def test_load_template_substitutes_variables(self, loader):
+        assert loader.load_template("simple", project_id="Demo") == 'project { id("Demo") }'
+
+    def test_load_template_missing_variable(self, loader):
+        with pytest.raises(ValueError, match="project_id"):
+            loader.load_template("simple")
+
+    def test_load_template_unknown_name(self, loader):
+        with pytest.raises(FileNotFoundError, match="multi"):
+            loader.load_template("absent")
+
+    def test_load_template_rereads_changed_file(self, loader, tmp_path):
+        assert loader.load_template("simple", project_id="Demo") == 'project { id("Demo") }'
+
+        template_path = tmp_path / "simple.kts"
+        template_path.write_text('project {{ name = "{project_id}" }}', encoding='utf-8')
+        stat = template_path.stat()
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert loader.load_template("simple", project_id="Demo") == 'project { name = "Demo" }'
+
+    def test_load_parametrized_template_generates_builds(self, loader):
+        content = loader.load_parametrized_template("multi", {'project_id': "Demo", 'build_count': 2})
+
+        assert 'id("Demo")' in content
+        assert "    buildType(Build1)\n    buildType(Build2)" in content
+        assert 'object Build2 : BuildType({\n    name = "Automated build configuration 2"\n})' in content
+        assert "BUILD_TEMPLATE" not in content
+        assert "{build_name}" not in content
+
+    def test_load_parametrized_template_without_build_count(self, loader):
+        content = loader.load_parametrized_template("simple", {'project_id': "Demo"})
+        assert content == 'project { id("Demo") }'
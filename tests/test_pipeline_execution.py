@@ -1,34 +1,130 @@
 import pytest
-import time
+import requests
 from utils.teamcity_client import TeamCityClient
 from utils.git_operations import GitOperations
 from utils.test_helpers import TestHelpers
-from config.settings import settings
+from config.settings import get_settings
+
+_MULTI_STAGE_DSL = '''
+import jetbrains.buildServer.configs.kotlin.v2019_2.*
+import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
+
+version = "2019.2"
+
+project {
+    buildType(Test)
+    buildType(Build)
+    buildType(Deploy)
+}
+
+object Test : BuildType({
+    name = "Test"
+
+    steps {
+        script {
+            scriptContent = "echo 'Running tests'"
+        }
+    }
+})
+
+object Build : BuildType({
+    name = "Build"
+
+    dependencies {
+        snapshot(Test) {}
+    }
+
+    steps {
+        script {
+            scriptContent = "echo 'Building application'"
+        }
+    }
+})
+
+object Deploy : BuildType({
+    name = "Deploy"
+
+    dependencies {
+        snapshot(Build) {}
+    }
+
+    steps {
+        script {
+            scriptContent = "echo 'Deploying application'"
+        }
+    }
+})
+'''
+
+_FAILING_PIPELINE_DSL = '''
+import jetbrains.buildServer.configs.kotlin.v2019_2.*
+import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
+
+version = "2019.2"
+
+project {
+    buildType(FailingBuild)
+}
+
+object FailingBuild : BuildType({
+    name = "Failing Build"
+
+    steps {
+        script {
+            scriptContent = "exit 1"  // This will cause the build to fail
+        }
+    }
+})
+'''
+
+_UPDATED_PIPELINE_DSL = '''
+import jetbrains.buildServer.configs.kotlin.v2019_2.*
+import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
+
+version = "2019.2"
+
+project {
+    buildType(UpdatedBuild)
+}
+
+object UpdatedBuild : BuildType({
+    name = "Updated Build"
+
+    steps {
+        script {
+            name = "Setup"
+            scriptContent = "echo 'Setting up environment'"
+        }
+        script {
+            name = "Build"
+            scriptContent = "echo 'Building application'"
+        }
+        script {
+            name = "Test"
+            scriptContent = "echo 'Running tests'"
+        }
+        script {
+            name = "Package"
+            scriptContent = "echo 'Packaging application'"
+        }
+    }
+})
+'''
 
 
 class TestPipelineExecution:
     """Test cases for CI/CD pipeline execution after DSL import/sync."""
 
     @pytest.fixture
-    def setup_pipeline_project(self, teamcity_client: TeamCityClient, test_project_id: str,
-                               git_operations: GitOperations, sample_kotlin_dsl, cleanup_project):
+    def setup_pipeline_project(self, teamcity_client: TeamCityClient, scaffold_project,
+                               git_operations: GitOperations, sample_kotlin_dsl):
         """Setup project with working pipeline from Kotlin DSL."""
-        if not settings.GIT_REPO_URL:
+        if not get_settings().GIT_REPO_URL:
             pytest.skip("GIT_REPO_URL not configured for pipeline tests")
 
-        cleanup_project(test_project_id)
-
-        # Create project
-        project_data = TestHelpers.generate_test_project_data(test_project_id)
-        teamcity_client.create_project(project_data)
-
-        # Create VCS root
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
-        vcs_root = teamcity_client.create_vcs_root(vcs_data)
-
-        # Enable versioned settings
-        vs_config = TestHelpers.generate_versioned_settings_config(vcs_root['id'])
-        teamcity_client.enable_versioned_settings(test_project_id, vs_config)
+        # Project, VCS root and versioned settings are shared by all pipeline tests
+        scaffold = scaffold_project("pipeline")
+        project_id = scaffold['project_id']
 
         # Create DSL in repository
         repo = git_operations.clone_repo()
@@ -39,23 +135,26 @@ class TestPipelineExecution:
         )
         git_operations.push_changes()
 
-        # Wait for synchronization to complete
+        # Wait for synchronization to complete; the shared project may still carry a
+        # previous test's DSL (the multi-stage one also has a 'Build'), so wait until
+        # exactly the sample DSL's single configuration is left
         def build_config_exists():
             try:
-                build_configs = teamcity_client.get_build_configurations(test_project_id)
-                return len(build_configs) > 0
-            except:
+                build_configs = teamcity_client.get_build_configurations(project_id)
+                return {bc.get('name') for bc in build_configs} == {'Build'}
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(build_config_exists, timeout=120)
 
-        build_configs = teamcity_client.get_build_configurations(test_project_id)
-        assert len(build_configs) > 0, "No build configurations found after setup"
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
+        build_config = next((bc for bc in build_configs if bc.get('name') == 'Build'), None)
+        assert build_config is not None, "No build configurations found after setup"
 
         return {
-            'project_id': test_project_id,
-            'build_config_id': build_configs[0]['id'],
-            'vcs_root_id': vcs_root['id']
+            'project_id': project_id,
+            'build_config_id': build_config['id'],
+            'vcs_root_id': scaffold['vcs_root_id']
         }
 
     def test_pipeline_execution_success(self, teamcity_client: TeamCityClient, setup_pipeline_project):
@@ -97,25 +196,14 @@ class TestPipelineExecution:
         # Verify parameters were applied (check build info)
         assert 'properties' in completed_build
 
-    def test_multiple_stage_pipeline(self, teamcity_client: TeamCityClient, test_project_id: str,
-                                     git_operations: GitOperations, cleanup_project):
+    def test_multiple_stage_pipeline(self, teamcity_client: TeamCityClient, scaffold_project,
+                                     git_operations: GitOperations):
         """Test execution of multi-stage pipeline."""
-        if not settings.GIT_REPO_URL:
+        if not get_settings().GIT_REPO_URL:
             pytest.skip("GIT_REPO_URL not configured")
 
-        cleanup_project(test_project_id)
-
         # Create project with multi-stage pipeline
-        project_data = TestHelpers.generate_test_project_data(test_project_id)
-        teamcity_client.create_project(project_data)
-
-        # Create VCS root
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
-        vcs_root = teamcity_client.create_vcs_root(vcs_data)
-
-        # Enable versioned settings
-        vs_config = TestHelpers.generate_versioned_settings_config(vcs_root['id'])
-        teamcity_client.enable_versioned_settings(test_project_id, vs_config)
+        project_id = scaffold_project("multi_stage")['project_id']
 
         # Create multi-stage DSL
         multi_stage_dsl = self._get_multi_stage_dsl()
@@ -130,15 +218,15 @@ class TestPipelineExecution:
         # Wait for synchronization
         def multiple_configs_exist():
             try:
-                build_configs = teamcity_client.get_build_configurations(test_project_id)
+                build_configs = teamcity_client.get_build_configurations(project_id)
                 return len(build_configs) >= 2
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(multiple_configs_exist, timeout=120)
 
         # Get build configurations
-        build_configs = teamcity_client.get_build_configurations(test_project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         assert len(build_configs) >= 2
 
         # Find the main build configuration
@@ -155,23 +243,14 @@ class TestPipelineExecution:
         # Verify pipeline executed successfully
         assert completed_build['state'] == 'finished'
 
-    def test_pipeline_failure_handling(self, teamcity_client: TeamCityClient, test_project_id: str,
-                                       git_operations: GitOperations, cleanup_project):
+    def test_pipeline_failure_handling(self, teamcity_client: TeamCityClient, scaffold_project,
+                                       git_operations: GitOperations):
         """Test pipeline behavior when stages fail."""
-        if not settings.GIT_REPO_URL:
+        if not get_settings().GIT_REPO_URL:
             pytest.skip("GIT_REPO_URL not configured")
 
-        cleanup_project(test_project_id)
-
         # Setup project
-        project_data = TestHelpers.generate_test_project_data(test_project_id)
-        teamcity_client.create_project(project_data)
-
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
-        vcs_root = teamcity_client.create_vcs_root(vcs_data)
-
-        vs_config = TestHelpers.generate_versioned_settings_config(vcs_root['id'])
-        teamcity_client.enable_versioned_settings(test_project_id, vs_config)
+        project_id = scaffold_project("failing")['project_id']
 
         # Create DSL with failing step
         failing_dsl = self._get_failing_pipeline_dsl()
@@ -186,15 +265,15 @@ class TestPipelineExecution:
         # Wait for sync
         def build_config_ready():
             try:
-                build_configs = teamcity_client.get_build_configurations(test_project_id)
+                build_configs = teamcity_client.get_build_configurations(project_id)
                 return len(build_configs) > 0
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(build_config_ready, timeout=120)
 
         # Trigger failing build
-        build_configs = teamcity_client.get_build_configurations(test_project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         build_config_id = build_configs[0]['id']
 
         build_info = teamcity_client.trigger_build(build_config_id)
@@ -221,11 +300,8 @@ class TestPipelineExecution:
             )
             build_ids.append(str(build_info['id']))
 
-        # Wait for all builds to complete
-        completed_builds = []
-        for build_id in build_ids:
-            completed_build = teamcity_client.wait_for_build_completion(build_id, timeout=300)
-            completed_builds.append(completed_build)
+        # Wait for all builds to complete, polling their states in one request per interval
+        completed_builds = teamcity_client.wait_for_builds_completion(build_ids, timeout=300)
 
         # Verify all builds completed
         for build in completed_builds:
@@ -241,6 +317,12 @@ class TestPipelineExecution:
         project_info = setup_pipeline_project
         project_id = project_info['project_id']
 
+        def build_config_names():
+            return {bc.get('name') for bc in teamcity_client.get_build_configurations(project_id)}
+
+        # Fingerprint the current configuration so we can tell when the update lands
+        original_names = build_config_names()
+
         # Update DSL with additional step
         updated_dsl = self._get_updated_pipeline_dsl()
 
@@ -252,10 +334,21 @@ class TestPipelineExecution:
         git_operations.push_changes()
 
         # Wait for synchronization
-        time.sleep(30)
+        def configs_updated():
+            try:
+                return build_config_names() != original_names
+            except (requests.exceptions.RequestException, KeyError):
+                return False
+
+        TestHelpers.wait_for_condition(
+            configs_updated,
+            timeout=60,
+            poll_interval=2,
+            error_message="Build configurations were not updated from DSL change within timeout"
+        )
 
         # Trigger build with updated configuration
-        build_configs = teamcity_client.get_build_configurations(project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         build_config_id = build_configs[0]['id']
 
         build_info = teamcity_client.trigger_build(build_config_id)
@@ -270,112 +363,12 @@ class TestPipelineExecution:
 
     def _get_multi_stage_dsl(self) -> str:
         """Get multi-stage pipeline DSL."""
-        return '''
-import jetbrains.buildServer.configs.kotlin.v2019_2.*
-import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
-
-version = "2019.2"
-
-project {
-    buildType(Test)
-    buildType(Build)
-    buildType(Deploy)
-}
-
-object Test : BuildType({
-    name = "Test"
-
-    steps {
-        script {
-            scriptContent = "echo 'Running tests'"
-        }
-    }
-})
-
-object Build : BuildType({
-    name = "Build"
-
-    dependencies {
-        snapshot(Test) {}
-    }
-
-    steps {
-        script {
-            scriptContent = "echo 'Building application'"
-        }
-    }
-})
-
-object Deploy : BuildType({
-    name = "Deploy"
-
-    dependencies {
-        snapshot(Build) {}
-    }
-
-    steps {
-        script {
-            scriptContent = "echo 'Deploying application'"
-        }
-    }
-})
-'''
+        return _MULTI_STAGE_DSL
 
     def _get_failing_pipeline_dsl(self) -> str:
         """Get pipeline DSL that will fail."""
-        return '''
-import jetbrains.buildServer.configs.kotlin.v2019_2.*
-import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
-
-version = "2019.2"
-
-project {
-    buildType(FailingBuild)
-}
-
-object FailingBuild : BuildType({
-    name = "Failing Build"
-
-    steps {
-        script {
-            scriptContent = "exit 1"  // This will cause the build to fail
-        }
-    }
-})
-'''
+        return _FAILING_PIPELINE_DSL
 
     def _get_updated_pipeline_dsl(self) -> str:
         """Get updated pipeline DSL with additional steps."""
-        return '''
-import jetbrains.buildServer.configs.kotlin.v2019_2.*
-import jetbrains.buildServer.configs.kotlin.v2019_2.buildSteps.script
-
-version = "2019.2"
-
-project {
-    buildType(UpdatedBuild)
-}
-
-object UpdatedBuild : BuildType({
-    name = "Updated Build"
-
-    steps {
-        script {
-            name = "Setup"
-            scriptContent = "echo 'Setting up environment'"
-        }
-        script {
-            name = "Build"
-            scriptContent = "echo 'Building application'"
-        }
-        script {
-            name = "Test"
-            scriptContent = "echo 'Running tests'"
-        }
-        script {
-            name = "Package"
-            scriptContent = "echo 'Packaging application'"
-        }
-    }
-})
-'''
\ No newline at end of file
+        return _UPDATED_PIPELINE_DSL
\ No newline at end of file
@@ -1,9 +1,70 @@
 import pytest
+import requests
 import time
 from utils.teamcity_client import TeamCityClient
 from utils.git_operations import GitOperations
 from utils.test_helpers import TestHelpers
-from config.settings import settings
+from config.settings import get_settings
+
+_LARGE_DSL = '''
+import jetbrains.buildServer.configs.kotlin.*
+import jetbrains.buildServer.configs.kotlin.buildSteps.script
+
+version = "2025.07"
+
+project {
+    buildType(Build1)
+    buildType(Build2)
+    buildType(Build3)
+    buildType(Deploy)
+}
+
+object Build1 : BuildType({
+    name = "Unit Tests"
+
+    steps {
+        script {
+            scriptContent = "echo 'Running unit tests'"
+        }
+    }
+})
+
+object Build2 : BuildType({
+    name = "Integration Tests"
+
+    steps {
+        script {
+            scriptContent = "echo 'Running integration tests'"
+        }
+    }
+})
+
+object Build3 : BuildType({
+    name = "Performance Tests"
+
+    steps {
+        script {
+            scriptContent = "echo 'Running performance tests'"
+        }
+    }
+})
+
+object Deploy : BuildType({
+    name = "Deploy"
+
+    dependencies {
+        snapshot(Build1) {}
+        snapshot(Build2) {}
+        snapshot(Build3) {}
+    }
+
+    steps {
+        script {
+            scriptContent = "echo 'Deploying application'"
+        }
+    }
+})
+'''
 
 
 class TestSynchronization:
@@ -12,17 +73,20 @@ class TestSynchronization:
     @pytest.fixture
     def setup_versioned_project(self, teamcity_client: TeamCityClient, test_project_id: str, cleanup_project):
         """Setup project with versioned settings enabled."""
-        if not settings.GIT_REPO_URL:
+        if not get_settings().GIT_REPO_URL:
             pytest.skip("GIT_REPO_URL not configured for synchronization tests")
 
         cleanup_project(test_project_id)
 
+        # These calls must stay sequential: the VCS root is created inside the
+        # project, and versioned settings reference the VCS root id.
+
         # Create project
         project_data = TestHelpers.generate_test_project_data(test_project_id)
         teamcity_client.create_project(project_data)
 
         # Create VCS root
-        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, settings.GIT_REPO_URL)
+        vcs_data = TestHelpers.generate_vcs_root_data(test_project_id, get_settings().GIT_REPO_URL)
         vcs_root = teamcity_client.create_vcs_root(vcs_data)
 
         # Enable versioned settings
@@ -40,21 +104,11 @@ class TestSynchronization:
         project_info = setup_versioned_project
         project_id = project_info['project_id']
 
-        # Trigger synchronization from server to VCS
-        teamcity_client.trigger_versioned_settings_sync(project_id)
-
-        # Wait for synchronization to complete
-        def sync_completed():
-            try:
-                vs_info = teamcity_client.get_versioned_settings(project_id)
-                return vs_info.get('enabled') is True
-            except:
-                return False
-
-        TestHelpers.wait_for_condition(sync_completed, timeout=60)
+        # Trigger synchronization from server to VCS and wait for a new sync result
+        teamcity_client.wait_versioned_settings_synced(project_id, timeout=60)
 
         # Verify synchronization status
-        vs_info = teamcity_client.get_versioned_settings(project_id)
+        vs_info = teamcity_client.get_versioned_settings(project_id, reuse_last=True)
         assert vs_info['enabled'] is True
 
     def test_vcs_to_server_synchronization(self, teamcity_client: TeamCityClient, setup_versioned_project,
@@ -82,13 +136,13 @@ class TestSynchronization:
             try:
                 build_configs = teamcity_client.get_build_configurations(project_id)
                 return len(build_configs) > 0
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(changes_detected, timeout=120)
 
         # Verify that build configuration was created from DSL
-        build_configs = teamcity_client.get_build_configurations(project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         assert len(build_configs) > 0
 
         # Find the build config created by our DSL
@@ -115,24 +169,24 @@ class TestSynchronization:
             try:
                 build_configs = teamcity_client.get_build_configurations(project_id)
                 return len(build_configs) > 0
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(server_updated, timeout=120)
 
         # Verify server has the configuration
-        build_configs = teamcity_client.get_build_configurations(project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         assert len(build_configs) > 0
 
         # Second: Make changes on server and verify they sync back to VCS
-        # Trigger server-to-VCS sync
-        teamcity_client.trigger_versioned_settings_sync(project_id)
+        # Trigger server-to-VCS sync; this returns only once the versioned settings
+        # status records a newer sync result than the one before the trigger
+        teamcity_client.wait_versioned_settings_synced(project_id, timeout=30)
 
-        # Wait and verify synchronization completed
-        time.sleep(10)  # Allow time for sync to complete
-
-        vs_info = teamcity_client.get_versioned_settings(project_id)
-        assert vs_info['enabled'] is True
+        # Versioned settings remain enabled and the configuration survived the round trip
+        snapshot = teamcity_client.get_project_sync_snapshot(project_id)
+        assert snapshot['enabled'] is True
+        assert len(snapshot['build_configs']) > 0
 
     def test_sync_conflict_resolution(self, teamcity_client: TeamCityClient, setup_versioned_project,
                                       git_operations: GitOperations, sample_kotlin_dsl):
@@ -152,7 +206,14 @@ class TestSynchronization:
         git_operations.push_changes()
 
         # Wait for initial sync
-        time.sleep(30)
+        def initial_sync_completed():
+            try:
+                build_configs = teamcity_client.get_build_configurations(project_id)
+                return len(build_configs) > 0
+            except (requests.exceptions.RequestException, KeyError):
+                return False
+
+        TestHelpers.wait_for_condition(initial_sync_completed, timeout=30)
 
         # Create conflicting version
         modified_dsl = sample_kotlin_dsl.replace('name = "Build"', 'name = "ModifiedBuild"')
@@ -166,9 +227,9 @@ class TestSynchronization:
         # Wait for conflict resolution
         def sync_stabilized():
             try:
-                vs_info = teamcity_client.get_versioned_settings(project_id)
-                return vs_info.get('enabled') is True
-            except:
+                snapshot = teamcity_client.get_project_sync_snapshot(project_id)
+                return snapshot['enabled'] and len(snapshot['build_configs']) > 0
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(sync_stabilized, timeout=180)
@@ -188,7 +249,7 @@ class TestSynchronization:
 
         repo = git_operations.clone_repo()
 
-        start_time = time.time()
+        start_time = time.monotonic()
 
         git_operations.create_commit(
             ".teamcity/settings.kts",
@@ -202,15 +263,15 @@ class TestSynchronization:
             try:
                 build_configs = teamcity_client.get_build_configurations(project_id)
                 return len(build_configs) >= 3  # Expecting multiple build configs from large DSL
-            except:
+            except (requests.exceptions.RequestException, KeyError):
                 return False
 
         TestHelpers.wait_for_condition(large_sync_completed, timeout=300)
 
-        sync_time = time.time() - start_time
+        sync_time = time.monotonic() - start_time
 
         # Verify all configurations were synchronized
-        build_configs = teamcity_client.get_build_configurations(project_id)
+        build_configs = teamcity_client.get_build_configurations(project_id, reuse_last=True)
         assert len(build_configs) >= 3
 
         # Performance assertion
@@ -218,62 +279,4 @@ class TestSynchronization:
 
     def _generate_large_kotlin_dsl(self) -> str:
         """Generate a large Kotlin DSL configuration for performance testing."""
-        return '''
-import jetbrains.buildServer.configs.kotlin.*
-import jetbrains.buildServer.configs.kotlin.buildSteps.script
-
-version = "2025.07"
-
-project {
-    buildType(Build1)
-    buildType(Build2)
-    buildType(Build3)
-    buildType(Deploy)
-}
-
-object Build1 : BuildType({
-    name = "Unit Tests"
-
-    steps {
-        script {
-            scriptContent = "echo 'Running unit tests'"
-        }
-    }
-})
-
-object Build2 : BuildType({
-    name = "Integration Tests"
-
-    steps {
-        script {
-            scriptContent = "echo 'Running integration tests'"
-        }
-    }
-})
-
-object Build3 : BuildType({
-    name = "Performance Tests"
-
-    steps {
-        script {
-            scriptContent = "echo 'Running performance tests'"
-        }
-    }
-})
-
-object Deploy : BuildType({
-    name = "Deploy"
-
-    dependencies {
-        snapshot(Build1) {}
-        snapshot(Build2) {}
-        snapshot(Build3) {}
-    }
-
-    steps {
-        script {
-            scriptContent = "echo 'Deploying application'"
-        }
-    }
-})
-'''
\ No newline at end of file
+        return _LARGE_DSL
\ No newline at end of file
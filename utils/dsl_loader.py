@@ -1,14 +1,18 @@
 import os
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from pathlib import Path
 
+_BUILD_TEMPLATE_RE = re.compile(r'// BUILD_TEMPLATE_START(.*?)// BUILD_TEMPLATE_END', re.DOTALL)
+
 
 class DSLTemplateLoader:
     """Load and process Kotlin DSL templates from files."""
 
     def __init__(self, templates_dir: str = "test_data/dsl_templates"):
         self.templates_dir = Path(templates_dir)
+        # Template contents keyed by path, with the mtime they were read at
+        self._cache: Dict[Path, Tuple[int, str]] = {}
         if not self.templates_dir.exists():
             raise FileNotFoundError(f"DSL templates directory not found: {templates_dir}")
 
@@ -23,40 +27,57 @@ class DSLTemplateLoader:
         Returns:
             Processed DSL content
         """
-        template_path = self.templates_dir / f"{template_name}.kts"
-
-        if not template_path.exists():
-            available = [f.stem for f in self.templates_dir.glob("*.kts")]
-            raise FileNotFoundError(
-                f"Template '{template_name}' not found. Available: {available}"
-            )
-
-        # Read template content
-        with open(template_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Substitute variables using Python string formatting
-        # try:
-        #     test = content.format(**kwargs)
-        #     return test
-        # except KeyError as e:
-        #     raise ValueError(f"Missing template variable: {e}")
+        return self._substitute(self._read_template(template_name), kwargs)
 
     def load_parametrized_template(self, template_name: str, parameters: Dict[str, Any]) -> str:
         """Load template with complex parameter substitution."""
-        content = self.load_template(template_name, **parameters)
+        content = self._read_template(template_name)
 
         # Handle special cases like repeated blocks
         if 'build_count' in parameters:
-            content = self._generate_multiple_builds(content, parameters['build_count'])
+            build_template = _BUILD_TEMPLATE_RE.search(content)
+            if build_template:
+                # The block's own fields ({build_name}, ...) are filled in per build
+                before = self._substitute(content[:build_template.start()], parameters)
+                after = self._substitute(content[build_template.end():], parameters)
+                content = before + build_template.group(0) + after
+                return self._generate_multiple_builds(content, parameters['build_count'])
+
+        return self._substitute(content, parameters)
+
+    def _read_template(self, template_name: str) -> str:
+        """Return the raw template content, re-reading the file only when it changed."""
+        template_path = self.templates_dir / f"{template_name}.kts"
+
+        try:
+            mtime = template_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            available = [f.stem for f in self.templates_dir.glob("*.kts")]
+            raise FileNotFoundError(
+                f"Template '{template_name}' not found. Available: {available}"
+            ) from None
 
+        # Read template content, unless the cached copy is still current
+        cached = self._cache.get(template_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        content = template_path.read_text(encoding='utf-8')
+        self._cache[template_path] = (mtime, content)
         return content
 
+    @staticmethod
+    def _substitute(content: str, values: Dict[str, Any]) -> str:
+        """Substitute variables using Python string formatting."""
+        try:
+            return content.format(**values)
+        except KeyError as e:
+            raise ValueError(f"Missing template variable: {e}")
+
     def _generate_multiple_builds(self, template: str, build_count: int) -> str:
         """Generate multiple build configurations from template."""
         # Look for build template markers in the DSL
-        build_template_pattern = r'// BUILD_TEMPLATE_START(.*?)// BUILD_TEMPLATE_END'
-        build_template = re.search(build_template_pattern, template, re.DOTALL)
+        build_template = _BUILD_TEMPLATE_RE.search(template)
 
         if not build_template:
             return template
@@ -78,7 +99,8 @@ class DSLTemplateLoader:
             builds.append(build_content)
 
         # Replace template markers with generated content
-        result = re.sub(build_template_pattern, '\n'.join(builds), template, flags=re.DOTALL)
+        generated_builds = '\n'.join(builds)
+        result = _BUILD_TEMPLATE_RE.sub(lambda _: generated_builds, template)
         result = result.replace('// BUILD_DECLARATIONS', '\n'.join(build_declarations))
 
         return result
@@ -1,19 +1,49 @@
-import git
+import getpass
+import socket
+import subprocess
+import sys
 import tempfile
 import shutil
 import os
-from typing import Optional
-from config.settings import settings
+from typing import Dict, List, Optional
+from config.settings import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _run_git(args: List[str], cwd: Optional[str] = None, extra_env: Optional[Dict[str, str]] = None) -> str:
+    """Run a git command and return its stripped stdout."""
+    command = ['git'] + (['-C', cwd] if cwd else []) + args
+    # Never block on a credentials prompt; fail instead.
+    env = {**os.environ, 'GIT_TERMINAL_PROMPT': '0', **(extra_env or {})}
+    result = subprocess.run(command, check=True, capture_output=True, text=True, env=env)
+    return result.stdout.strip()
+
+
+def _fallback_identity_env() -> Dict[str, str]:
+    """
+    Environment giving commits a user@host email when none is configured, like
+    GitPython's default Actor. git only consults EMAIL after user.email, so a
+    configured identity still wins.
+    """
+    if 'EMAIL' in os.environ:
+        return {}
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        # No login name and no passwd entry (e.g. some CI containers); leave it to git
+        return {}
+    return {'EMAIL': f"{user}@{socket.gethostname()}"}
+
+
 class GitOperations:
-    def __init__(self, repo_url: str = None):
-        self.repo_url = repo_url or settings.GIT_REPO_URL
+    def __init__(self, repo_url: str = None, base_repo: str = None):
+        self.repo_url = repo_url or get_settings().GIT_REPO_URL
+        # Local bare clone to check out worktrees from instead of cloning over the network
+        self.base_repo = base_repo
         self.temp_dir = None
-        self.repo = None
+        self.working_dir = None
 
     def __enter__(self):
         return self
@@ -21,60 +51,108 @@ class GitOperations:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.cleanup()
 
-    def clone_repo(self, target_dir: str = None) -> git.Repo:
-        """Clone repository to temporary directory."""
+    def clone_repo(self, target_dir: str = None, branch: str = "main", bare: bool = False) -> str:
+        """
+        Check out the repository into a temporary directory.
+
+        With a base_repo this fetches branch into it and adds a local worktree at
+        the fetched head; otherwise it makes a shallow clone of repo_url (bare if
+        requested). Calling it again without a target reuses the existing checkout.
+
+        Returns:
+            Path of the working directory (the repository itself when bare)
+        """
+        if self.working_dir and not target_dir:
+            return self.working_dir
+
         if not target_dir:
             self.temp_dir = tempfile.mkdtemp()
             target_dir = self.temp_dir
 
         try:
-            self.repo = git.Repo.clone_from(self.repo_url, target_dir)
-            logger.info(f"Repository cloned to {target_dir}")
-            return self.repo
-        except git.exc.GitCommandError as e:
-            logger.error(f"Failed to clone repository: {e}")
+            if self.base_repo:
+                # The base clone goes stale as other suites and TeamCity itself push
+                _run_git(['fetch', '--depth=1', 'origin', branch], cwd=self.base_repo)
+                _run_git(['worktree', 'add', '-B', branch, target_dir, 'FETCH_HEAD'],
+                         cwd=self.base_repo)
+                logger.info(f"Worktree of {self.base_repo} added at {target_dir}")
+            else:
+                args = ['clone', '--depth=1', '--single-branch', '--no-tags']
+                if bare:
+                    args.append('--bare')
+                _run_git(args + [self.repo_url, target_dir])
+                logger.info(f"Repository cloned to {target_dir}")
+            self.working_dir = target_dir
+            return self.working_dir
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to clone repository: {e.stderr}")
             raise
 
     def create_commit(self, file_path: str, content: str, commit_message: str) -> str:
         """Create a commit with specified file changes."""
-        if not self.repo:
+        if not self.working_dir:
             raise ValueError("Repository not initialized")
 
-        full_path = os.path.join(self.repo.working_dir, file_path)
+        full_path = os.path.join(self.working_dir, file_path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Checkouts only hold tracked files, plus files created by earlier commits
+        is_tracked = os.path.exists(full_path)
 
         with open(full_path, 'w') as f:
             f.write(content)
 
-        self.repo.index.add([file_path])
-        commit = self.repo.index.commit(commit_message)
+        # Committing the path directly stages tracked files; only new ones need an add
+        if not is_tracked:
+            _run_git(['add', file_path], cwd=self.working_dir)
+        # Tests push identical DSL back to back; still commit, as GitPython's index.commit did
+        _run_git(['commit', '-q', '--allow-empty', '-m', commit_message, '--', file_path],
+                 cwd=self.working_dir, extra_env=_fallback_identity_env())
+        commit_hash = _run_git(['rev-parse', 'HEAD'], cwd=self.working_dir)
 
-        logger.info(f"Created commit: {commit.hexsha}")
-        return commit.hexsha
+        logger.info(f"Created commit: {commit_hash}")
+        return commit_hash
 
     def push_changes(self, branch: str = "main") -> bool:
-        """Push changes to remote repository."""
-        if not self.repo:
+        """Push changes to remote repository, raising CalledProcessError on failure."""
+        if not self.working_dir:
             raise ValueError("Repository not initialized")
 
         try:
-            origin = self.repo.remote("origin")
-            origin.push(branch)
+            _run_git(['push', 'origin', branch], cwd=self.working_dir)
             logger.info(f"Changes pushed to {branch}")
             return True
-        except git.exc.GitCommandError as e:
-            logger.error(f"Failed to push changes: {e}")
-            return False
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to push changes: {e.stderr}")
+            raise
 
     def get_latest_commit_hash(self, branch: str = "main") -> str:
         """Get latest commit hash from branch."""
-        if not self.repo:
+        if not self.working_dir:
             raise ValueError("Repository not initialized")
 
-        return self.repo.commit(branch).hexsha
+        return _run_git(['rev-parse', branch], cwd=self.working_dir)
 
     def cleanup(self):
-        """Clean up temporary directory."""
+        """Clean up temporary directory, detaching it first if it is a worktree."""
+        if self.base_repo and self.working_dir:
+            try:
+                _run_git(['worktree', 'remove', '--force', self.working_dir], cwd=self.base_repo)
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Failed to remove worktree {self.working_dir}: {e.stderr}")
+
         if self.temp_dir and os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
-            logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
\ No newline at end of file
+            # A single rm -rf beats shutil.rmtree's per-file Python recursion over .git/objects
+            if sys.platform != 'win32':
+                result = subprocess.run(['rm', '-rf', self.temp_dir], capture_output=True, text=True)
+                error = result.stderr.strip() if result.returncode else None
+            else:
+                try:
+                    shutil.rmtree(self.temp_dir)
+                    error = None
+                except OSError as e:
+                    error = str(e)
+
+            if error:
+                logger.warning(f"Failed to clean up temporary directory {self.temp_dir}: {error}")
+            else:
+                logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
@@ -1,18 +1,51 @@
+import orjson
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from typing import Dict, Any, Optional, List
-from config.settings import settings
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+from config.settings import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout applied to every request unless the caller overrides it.
+_REQUEST_TIMEOUT = (5, 30)
+
+
+def _decode(response: requests.Response) -> Any:
+    """Decode a JSON response body, raising requests' JSONDecodeError like response.json() does."""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+
+def _sync_result(vs_info: Dict[str, Any]) -> Tuple[Any, Any]:
+    """Identify the last synchronization result recorded in a versioned settings status."""
+    return vs_info.get('timestamp'), vs_info.get('message')
+
 
 class TeamCityClient:
     def __init__(self):
+        settings = get_settings()
         self.base_url = settings.TEAMCITY_URL
         self.auth = settings.auth
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=settings.MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._last_responses: Dict[tuple, requests.Response] = {}
 
         if isinstance(self.auth, tuple):
             self.session.auth = self.auth
@@ -24,35 +57,65 @@ class TeamCityClient:
             'Content-Type': 'application/json'
         })
 
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make HTTP request with error handling and retries."""
+    def _make_request(self, method: str, endpoint: str, remember: bool = False, reuse_last: bool = False,
+                      **kwargs) -> requests.Response:
+        """
+        Make HTTP request with error handling; retries are handled by the session adapter.
+
+        GET responses made with remember are kept as the last response for that
+        request, and reuse_last returns it instead of asking the server again, so
+        re-reading what a successful poll just saw costs no round trip. Any other
+        method drops them, since it may change server state.
+        """
         url = f"{self.base_url}/app/rest{endpoint}"
+        kwargs.setdefault('timeout', _REQUEST_TIMEOUT)
 
-        for attempt in range(settings.MAX_RETRIES):
-            try:
-                response = self.session.request(method, url, **kwargs)
-                response.raise_for_status()
-                return response
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Request attempt {attempt + 1} failed: {e}")
-                if attempt == settings.MAX_RETRIES - 1:
-                    raise
-                time.sleep(settings.POLL_INTERVAL)
+        cache_key = None
+        if method != 'GET':
+            self._last_responses.clear()
+        elif remember:
+            cache_key = (endpoint, frozenset((kwargs.get('params') or {}).items()))
+            if reuse_last and cache_key in self._last_responses:
+                return self._last_responses[cache_key]
 
-    def get_projects(self) -> List[Dict[str, Any]]:
-        """Get all projects."""
-        response = self._make_request('GET', '/projects')
-        return response.json().get('project', [])
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Request {method} {endpoint} failed: {e}")
+            raise
+
+        if cache_key:
+            self._last_responses[cache_key] = response
+        return response
+
+    def get_projects(self, locator: str = None) -> List[Dict[str, Any]]:
+        """Get all projects, optionally filtered server-side by a TeamCity locator."""
+        params = {'locator': locator} if locator else None
+        response = self._make_request('GET', '/projects', params=params)
+        return _decode(response).get('project', [])
+
+    def iter_project_ids(self, prefix: str = None) -> Iterator[str]:
+        """Yield project ids, optionally only those starting with prefix, fetching just the id field."""
+        params = {'fields': 'project(id)'}
+        if prefix:
+            params['locator'] = f"id:(value:{prefix},matchType:starts-with)"
+
+        response = self._make_request('GET', '/projects', params=params)
+        for project in _decode(response).get('project', []):
+            # Re-check the prefix so a locator the server ignores can never widen the result
+            if not prefix or project['id'].startswith(prefix):
+                yield project['id']
 
     def get_project(self, project_id: str) -> Dict[str, Any]:
         """Get specific project details."""
         response = self._make_request('GET', f'/projects/{project_id}')
-        return response.json()
+        return _decode(response)
 
     def create_project(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new project."""
         response = self._make_request('POST', '/projects', json=project_data)
-        return response.json()
+        return _decode(response)
 
     def delete_project(self, project_id: str) -> bool:
         """Delete a project."""
@@ -62,25 +125,86 @@ class TeamCityClient:
         except requests.exceptions.RequestException:
             return False
 
-    def get_versioned_settings(self, project_id: str) -> Dict[str, Any]:
-        """Get versioned settings for a project."""
-        response = self._make_request('GET', f'/projects/id:{project_id}/versionedSettings/status')
-        return response.json()
+    def get_versioned_settings(self, project_id: str, reuse_last: bool = False) -> Dict[str, Any]:
+        """Get versioned settings for a project; reuse_last returns the previous poll's result."""
+        response = self._make_request('GET', f'/projects/id:{project_id}/versionedSettings/status',
+                                      remember=True, reuse_last=reuse_last)
+        return _decode(response)
+
+    def get_project_sync_snapshot(self, project_id: str) -> Dict[str, Any]:
+        """
+        Get the versioned settings state and build configurations of a project in one request.
+
+        Returns:
+            {'enabled': bool, 'build_configs': [{'id': ..., 'name': ...}, ...]}
+        """
+        response = self._make_request('GET', f'/projects/id:{project_id}', params={
+            'fields': 'id,buildTypes(buildType(id,name)),'
+                      'projectFeatures(projectFeature(type,properties(property(name,value))))'
+        })
+        project = _decode(response)
+
+        features = project.get('projectFeatures', {}).get('projectFeature', [])
+        versioned_settings = next((f for f in features if f.get('type') == 'versionedSettings'), {})
+        properties = {p['name']: p.get('value')
+                      for p in versioned_settings.get('properties', {}).get('property', [])}
+
+        return {
+            'enabled': properties.get('enabled') == 'true',
+            'build_configs': project.get('buildTypes', {}).get('buildType', [])
+        }
 
     def enable_versioned_settings(self, project_id: str, vcs_settings: Dict[str, Any]) -> Dict[str, Any]:
         """Enable versioned settings for a project."""
         response = self._make_request('PUT', f'/projects/{project_id}/versionedSettings/config', json=vcs_settings)
-        return response.json()
+        return _decode(response)
 
     def trigger_versioned_settings_sync(self, project_id: str) -> Dict[str, Any]:
         """Trigger synchronization of versioned settings."""
         response = self._make_request('POST', f'/projects/{project_id}/versionedSettings/synchronize')
-        return response.json()
+        return _decode(response)
+
+    def wait_versioned_settings_synced(self, project_id: str, timeout: int = 60) -> Dict[str, Any]:
+        """
+        Trigger synchronization of versioned settings and wait for it to finish.
+
+        The server records the outcome of every sync in the versioned settings
+        status, so completion is detected by that status reporting a newer
+        result (timestamp or message) than before the trigger.
+
+        Returns:
+            The versioned settings status reported after the sync
+        """
+        previous = _sync_result(self.get_versioned_settings(project_id))
+        self.trigger_versioned_settings_sync(project_id)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                vs_info = self.get_versioned_settings(project_id)
+                if _sync_result(vs_info) != previous:
+                    return vs_info
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Versioned settings status check failed: {e}")
+            time.sleep(get_settings().POLL_INTERVAL)
+
+        raise TimeoutError(f"Versioned settings of {project_id} did not sync within {timeout} seconds")
 
-    def get_build_configurations(self, project_id: str) -> List[Dict[str, Any]]:
-        """Get build configurations for a project."""
-        response = self._make_request('GET', f'/buildTypes?locator=project:{project_id}')
-        return response.json().get('buildType')
+    def get_build_configurations(self, project_id: str, fields: str = None,
+                                 reuse_last: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get build configurations for a project, optionally limited to the given TeamCity fields.
+
+        With reuse_last the response of the previous identical call is returned
+        if there is one, e.g. to re-read the configurations a wait just saw.
+        """
+        params = {'fields': fields} if fields else None
+        response = self._make_request('GET', f'/buildTypes?locator=project:{project_id}', params=params,
+                                      remember=True, reuse_last=reuse_last)
+        # Polls mostly see an empty project; skip decoding when there is nothing to return
+        if b'"buildType"' not in response.content:
+            return []
+        return _decode(response).get('buildType', [])
 
     def trigger_build(self, build_config_id: str, properties: Dict[str, str] = None) -> Dict[str, Any]:
         """Trigger a build."""
@@ -93,30 +217,58 @@ class TeamCityClient:
             }
 
         response = self._make_request('POST', '/buildQueue', json=build_data)
-        return response.json()
+        return _decode(response)
 
     def get_build_status(self, build_id: str) -> Dict[str, Any]:
         """Get build status."""
         response = self._make_request('GET', f'/builds/{build_id}')
-        return response.json()
+        return _decode(response)
 
     def wait_for_build_completion(self, build_id: str, timeout: int = 300) -> Dict[str, Any]:
         """Wait for build to complete."""
-        start_time = time.time()
+        deadline = time.monotonic() + timeout
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() < deadline:
             build_info = self.get_build_status(build_id)
             state = build_info.get('state')
 
             if state in ['finished', 'canceled']:
                 return build_info
             elif state == 'running':
-                time.sleep(settings.POLL_INTERVAL)
+                time.sleep(get_settings().POLL_INTERVAL)
             else:
-                time.sleep(settings.POLL_INTERVAL)
+                time.sleep(get_settings().POLL_INTERVAL)
 
         raise TimeoutError(f"Build {build_id} did not complete within {timeout} seconds")
 
+    def get_builds_status(self, build_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get id, state and status of several builds in a single request, keyed by build id."""
+        locator = ','.join(f'item:(id:{build_id})' for build_id in build_ids)
+        response = self._make_request('GET', '/builds', params={
+            'locator': locator,
+            'fields': 'build(id,state,status)'
+        })
+        return {str(build['id']): build for build in _decode(response).get('build', [])}
+
+    def wait_for_builds_completion(self, build_ids: List[str], timeout: int = 300) -> List[Dict[str, Any]]:
+        """Wait for several builds to complete, polling all of them with one request per interval."""
+        pending = [str(build_id) for build_id in build_ids]
+        completed = {}
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            for build_id, build_info in self.get_builds_status(pending).items():
+                if build_info.get('state') in ['finished', 'canceled']:
+                    completed[build_id] = build_info
+
+            pending = [build_id for build_id in pending if build_id not in completed]
+            if not pending:
+                return [completed[str(build_id)] for build_id in build_ids]
+
+            time.sleep(get_settings().POLL_INTERVAL)
+
+        raise TimeoutError(f"Builds {pending} did not complete within {timeout} seconds")
+
     def get_vcs_roots(self, project_id: str = None) -> List[Dict[str, Any]]:
         """Get VCS roots."""
         endpoint = '/vcs-roots'
@@ -124,9 +276,9 @@ class TeamCityClient:
             endpoint += f'?locator=project:{project_id}'
 
         response = self._make_request('GET', endpoint)
-        return response.json().get('vcs-root', [])
+        return _decode(response).get('vcs-root', [])
 
     def create_vcs_root(self, vcs_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a VCS root."""
         response = self._make_request('POST', '/vcs-roots', json=vcs_data)
-        return response.json()
\ No newline at end of file
+        return _decode(response)
\ No newline at end of file
@@ -1,34 +1,65 @@
+import random
 import time
 import json
 from typing import Dict, Any, Callable
-from config.settings import settings
+from config.settings import get_settings
 from utils.dsl_loader import DSLTemplateLoader
 import logging
 
 logger = logging.getLogger(__name__)
 
+_INITIAL_POLL_DELAY = 0.1
+_POLL_BACKOFF_FACTOR = 1.7
+
+_REQUIRED_PROJECT_FIELDS = ('id', 'name', 'versionedSettingsConfig')
+
+# VCS root properties that do not depend on the project or credentials
+_VCS_ROOT_STATIC_PROPERTIES = (
+    ("branch", "refs/heads/main"),
+    ("authMethod", "PASSWORD"),
+)
+
+_VS_CONFIG_BASE = {
+    "format": "kotlin",
+    "synchronizationMode": "enabled",
+    "allowUIEditing": True,
+    "storeSecureValuesOutsideVcs": True,
+    "importDecision": "importFromVCS",
+    "buildSettingsMode": "useFromVCS"
+}
+
 
 class TestHelpers:
     @staticmethod
     def wait_for_condition(condition_func: Callable[[], bool],
-                           timeout: int = settings.TIMEOUT,
-                           poll_interval: int = settings.POLL_INTERVAL,
+                           timeout: int = get_settings().TIMEOUT,
+                           poll_interval: int = get_settings().POLL_INTERVAL,
                            error_message: str = "Condition not met within timeout") -> bool:
-        """Wait for a condition to be true."""
-        start_time = time.time()
+        """
+        Wait for a condition to be true.
 
-        while time.time() - start_time < timeout:
+        Polls with exponential backoff (plus a little jitter), starting at
+        _INITIAL_POLL_DELAY and capped at poll_interval, so fast transitions are
+        noticed quickly while long waits still poll at most every poll_interval.
+        The last sleep is clipped to the deadline, where the condition gets one
+        final check, so the wait never overruns timeout by a poll interval.
+        """
+        deadline = time.monotonic() + timeout
+        delay = _INITIAL_POLL_DELAY
+
+        while True:
             if condition_func():
                 return True
-            time.sleep(poll_interval)
-
-        raise TimeoutError(error_message)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(error_message)
+            time.sleep(min(delay + random.uniform(0, delay * 0.1), remaining))
+            delay = min(delay * _POLL_BACKOFF_FACTOR, poll_interval)
 
     @staticmethod
     def validate_kotlin_dsl_structure(project_data: Dict[str, Any]) -> bool:
         """Validate that project has proper Kotlin DSL structure."""
-        required_fields = ['id', 'name', 'versionedSettingsConfig']
-        return all(field in project_data for field in required_fields)
+        return all(field in project_data for field in _REQUIRED_PROJECT_FIELDS)
 
     @staticmethod
     def generate_test_project_data(project_id: str) -> Dict[str, Any]:
@@ -42,6 +73,7 @@ class TestHelpers:
     @staticmethod
     def generate_vcs_root_data(project_id: str, repo_url: str) -> Dict[str, Any]:
         """Generate VCS root configuration."""
+        settings = get_settings()
         return {
             "name": f"{project_id}_VCS",
             "vcsName": "jetbrains.git",
@@ -49,8 +81,7 @@ class TestHelpers:
             "properties": {
                 "property": [
                     {"name": "url", "value": repo_url},
-                    {"name": "branch", "value": "refs/heads/main"},
-                    {"name": "authMethod", "value": "PASSWORD"},
+                    *({"name": name, "value": value} for name, value in _VCS_ROOT_STATIC_PROPERTIES),
                     {"name": "username", "value": settings.GIT_USERNAME},
                     {"name": "secure:password", "value": settings.GIT_TOKEN}
                 ]
@@ -60,15 +91,7 @@ class TestHelpers:
     @staticmethod
     def generate_versioned_settings_config(vcs_root_id: str) -> Dict[str, Any]:
         """Generate versioned settings configuration."""
-        return {
-            "format": "kotlin",
-            "synchronizationMode": "enabled",
-            "allowUIEditing": True,
-            "storeSecureValuesOutsideVcs": True,
-            "vcsRootId": vcs_root_id,
-            "importDecision": "importFromVCS",
-            "buildSettingsMode": "useFromVCS"
-        }
+        return {**_VS_CONFIG_BASE, "vcsRootId": vcs_root_id}
 
     @staticmethod
     def load_expected_response(filename: str) -> Dict[str, Any]: